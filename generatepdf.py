@@ -1,33 +1,43 @@
 import io
 import os
-import json
+import copy
+import asyncio
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from datetime import datetime
-from collections import defaultdict
-
-import matplotlib
-matplotlib.use("AGG")
-import matplotlib.pyplot as plt  # Retained if needed
 
 from dotenv import load_dotenv
 load_dotenv()
 
 import httpx
+import numpy as np
+import orjson
 
-# --- Plotly Imports for Modern Charts ---
-import plotly.graph_objects as go
-import plotly.express as px
-import plotly.io as pio
+import plotly.colors
 
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import (BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, Table,
-                                TableStyle, Image, PageBreak, NextPageTemplate, HRFlowable, Flowable)
+                                TableStyle, PageBreak, NextPageTemplate, HRFlowable, Flowable)
 from reportlab.platypus.tableofcontents import TableOfContents
 from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
 from reportlab.lib import colors
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.enums import TA_CENTER
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Drawing, Group, String
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.widgets.markers import makeMarker
+
+log = logging.getLogger(__name__)
 
 # === Register Roboto Fonts ===
 font_dir = os.path.abspath("./fonts")
@@ -38,12 +48,21 @@ fonts = {
     "Roboto-Medium": "Roboto-Medium.ttf",
     "Roboto-Bold": "Roboto-Bold.ttf"
 }
-for name, filename in fonts.items():
-    path = os.path.join(font_dir, filename)
-    if os.path.exists(path):
-        pdfmetrics.registerFont(TTFont(name, path))
-    else:
-        print(f"Font file not found: {path}")
+
+@lru_cache(maxsize=1)
+def _register_fonts():
+    """
+    Registers the Roboto fonts once per process, on first use rather than at import.
+    """
+    available = {entry.name for entry in os.scandir(font_dir)} if os.path.isdir(font_dir) else set()
+    registered = set(pdfmetrics.getRegisteredFontNames())
+    for name, filename in fonts.items():
+        if name in registered:
+            continue
+        if filename in available:
+            pdfmetrics.registerFont(TTFont(name, os.path.join(font_dir, filename)))
+        else:
+            log.warning("Font file not found: %s", os.path.join(font_dir, filename))
 
 # === Custom Styles (Red & White Theme) ===
 custom_styles = {
@@ -63,68 +82,206 @@ custom_styles = {
                           textColor=colors.HexColor("#a6192e"), spaceAfter=4),
 }
 
-# === Chart Generation Functions using Plotly (Red & White Theme) ===
+# === Chart Generation Functions (Red & White Theme) ===
+# Charts are drawn natively as ReportLab Drawings, so they stay vector and need no browser.
+
+# Red-based palette sampled once from Plotly's Reds scale; bar charts index into it
+_REDS_PALETTE = [colors.toColor(c) for c in plotly.colors.sample_colorscale("Reds", [i / 31 for i in range(32)])]
+
+# Line colors follow Plotly's default colorway, which the report used before
+_LINE_PALETTE = [colors.toColor(c) for c in plotly.colors.qualitative.Plotly]
+
+# Every chart is drawn on the same 700x500 canvas so they all scale alike in ChartImage
+CHART_WIDTH, CHART_HEIGHT = 700, 500
+
+# Aim for about this many date labels along a line chart's x axis
+_MAX_X_LABELS = 8
+
+# Bar charts label at most this many categories, each cut to _BAR_LABEL_CHARS characters
+_MAX_BAR_LABELS = 15
+_BAR_LABEL_CHARS = 18
+
+def _add_chart_labels(drawing, chart, title, x_label, y_label):
+    drawing.add(String(chart.x, 460, title, fontName="Roboto-Regular", fontSize=20))
+    drawing.add(String(chart.x + chart.width / 2, 30, x_label, fontName="Roboto-Regular", fontSize=14,
+                       textAnchor="middle"))
+    drawing.add(Group(String(0, 0, y_label, fontName="Roboto-Regular", fontSize=14, textAnchor="middle"),
+                      transform=(0, 1, -1, 0, 30, chart.y + chart.height / 2)))
+
+def _date_labels(values):
+    """
+    Formats x values as "Jan 05" dates, adding the year when they span more than one;
+    values that aren't dates are shown as they are.
+    """
+    try:
+        dates = [datetime.fromisoformat(str(value)) for value in values]
+    except ValueError:
+        return [str(value) for value in values]
+    fmt = "%b %d '%y" if len({d.year for d in dates}) > 1 else "%b %d"
+    return [d.strftime(fmt) for d in dates]
+
+def _bar_label(label):
+    label = str(label)
+    return label if len(label) <= _BAR_LABEL_CHARS else label[:_BAR_LABEL_CHARS - 1] + "\u2026"
+
 def create_bar_chart(data, labels, title, x_label, y_label):
+    """
+    Draws the bar chart directly as a ReportLab Drawing. Category labels are thinned and
+    shortened when there are many, and rotated when they would run into each other.
+    """
+    _register_fonts()
     n = len(data)
-    # Generate a red-based palette using Plotly's Reds scale
-    palette = []
+    # Pick evenly spaced shades from the precomputed Reds palette
     if n == 1:
-        palette = ["#a6192e"]
+        palette = [colors.HexColor("#a6192e")]
     else:
-        for i in range(n):
-            col = px.colors.sample_colorscale("Reds", i/(n-1))[0]
-            palette.append(col)
-    fig = go.Figure(data=[go.Bar(x=labels, y=data, marker_color=palette)])
-    fig.update_layout(
-        title=title,
-        xaxis_title=x_label,
-        yaxis_title=y_label,
-        template="plotly_white",
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        font=dict(color="black"),
-    )
-    img_bytes = pio.to_image(fig, format="png", scale=2)
-    return io.BytesIO(img_bytes)
+        palette = [_REDS_PALETTE[i * (len(_REDS_PALETTE) - 1) // (n - 1)] for i in range(n)]
+    drawing = Drawing(CHART_WIDTH, CHART_HEIGHT)
+    chart = VerticalBarChart()
+    chart.x, chart.y = 80, 90
+    chart.width, chart.height = 560, 330
+    chart.data = [list(data) or [0]]
+    chart.bars.strokeColor = None
+    for i, col in enumerate(palette):
+        chart.bars[(0, i)].fillColor = col
+    step = max(1, -(-len(labels) // _MAX_BAR_LABELS))
+    names = [_bar_label(label) if i % step == 0 else "" for i, label in enumerate(labels)]
+    chart.categoryAxis.categoryNames = names or [""]
+    chart.categoryAxis.strokeColor = None
+    chart.categoryAxis.labels.fontName = "Roboto-Regular"
+    chart.categoryAxis.labels.fontSize = 12
+    chart.categoryAxis.labels.dy = -6
+    widest = max((pdfmetrics.stringWidth(name, "Roboto-Regular", 12) for name in names), default=0)
+    if widest > chart.width / max(n, 1) * step:
+        # Angle the labels and lift the plot so they fit between it and the x-axis title
+        chart.y, chart.height = 150, 270
+        chart.categoryAxis.labels.angle = 40
+        chart.categoryAxis.labels.boxAnchor = "ne"
+    chart.valueAxis.valueMin = 0
+    if not any(data):
+        chart.valueAxis.valueMax = 1
+    chart.valueAxis.strokeColor = None
+    chart.valueAxis.visibleGrid = True
+    chart.valueAxis.gridStrokeColor = colors.HexColor("#ebf0f8")
+    chart.valueAxis.labels.fontName = "Roboto-Regular"
+    chart.valueAxis.labels.fontSize = 12
+    drawing.add(chart)
+    _add_chart_labels(drawing, chart, title, x_label, y_label)
+    return drawing
 
 def create_multi_line_chart(x_values, y_series, title, x_label, y_label):
-    fig = go.Figure()
-    for label, y_values in y_series.items():
-        fig.add_trace(go.Scatter(x=x_values, y=y_values, mode="lines+markers", name=label,
-                                 line=dict(width=2)))
-    fig.update_layout(
-        title=title,
-        xaxis_title=x_label,
-        yaxis_title=y_label,
-        template="plotly_white",
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        font=dict(color="black"),
-    )
-    img_bytes = pio.to_image(fig, format="png", scale=1)
-    return io.BytesIO(img_bytes)
+    """
+    Draws one line per series over shared x values as a ReportLab Drawing, with a legend
+    when there is more than one series.
+    """
+    _register_fonts()
+    series = [list(values) for values in y_series.values()] or [[0]]
+    drawing = Drawing(CHART_WIDTH, CHART_HEIGHT)
+    chart = HorizontalLineChart()
+    chart.x, chart.y = 80, 90
+    chart.width, chart.height = 560 if len(series) == 1 else 470, 330
+    chart.data = [values or [0] for values in series]
+    for i in range(len(series)):
+        chart.lines[i].strokeColor = _LINE_PALETTE[i % len(_LINE_PALETTE)]
+        chart.lines[i].strokeWidth = 2
+        chart.lines[i].symbol = makeMarker("FilledCircle", size=4)
+    # The x axis is categorical: points are evenly spaced, so gaps between dates aren't shown to scale
+    labels = _date_labels(x_values)
+    widest = max((pdfmetrics.stringWidth(label, "Roboto-Regular", 12) for label in labels), default=0)
+    max_labels = max(1, min(_MAX_X_LABELS, int(chart.width // (widest + 12))))
+    step = max(1, -(-len(labels) // max_labels))
+    chart.categoryAxis.categoryNames = [label if i % step == 0 else "" for i, label in enumerate(labels)] or [""]
+    chart.categoryAxis.strokeColor = None
+    chart.categoryAxis.labels.fontName = "Roboto-Regular"
+    chart.categoryAxis.labels.fontSize = 12
+    chart.categoryAxis.labels.dy = -6
+    chart.valueAxis.valueMin = 0
+    if not any(map(any, series)):
+        chart.valueAxis.valueMax = 1
+    chart.valueAxis.strokeColor = None
+    chart.valueAxis.visibleGrid = True
+    chart.valueAxis.gridStrokeColor = colors.HexColor("#ebf0f8")
+    chart.valueAxis.labels.fontName = "Roboto-Regular"
+    chart.valueAxis.labels.fontSize = 12
+    drawing.add(chart)
+    if len(y_series) > 1:
+        legend = Legend()
+        legend.x, legend.y = chart.x + chart.width + 20, chart.y + chart.height
+        legend.fontName = "Roboto-Regular"
+        legend.fontSize = 12
+        legend.strokeColor = None
+        legend.alignment = "right"
+        legend.colorNamePairs = [(chart.lines[i].strokeColor, str(label)) for i, label in enumerate(y_series)]
+        drawing.add(legend)
+    _add_chart_labels(drawing, chart, title, x_label, y_label)
+    return drawing
 
 def create_line_chart(data_points):
     x_values, y_values = zip(*data_points)
-    fig = go.Figure(data=go.Scatter(x=x_values, y=y_values, mode="lines+markers", line=dict(width=2)))
-    fig.update_layout(
-        title="Line Chart",
-        xaxis_title="X-Axis (Time)",
-        yaxis_title="Y-Axis (Values)",
-        template="plotly_white",
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        font=dict(color="black"),
-    )
-    img_bytes = pio.to_image(fig, format="png", scale=2)
-    return io.BytesIO(img_bytes)
+    return create_multi_line_chart(x_values, {"Values": y_values}, "Line Chart", "X-Axis (Time)", "Y-Axis (Values)")
+
+# === Chart Rendering ===
+# Recently drawn charts keyed by their inputs; identical inputs always give the same Drawing
+_CHART_CACHE = OrderedDict()
+_CHART_CACHE_SIZE = 32
+_CHART_CACHE_LOCK = threading.Lock()
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _chart_key(chart):
+    return chart.chart_func.__name__, _freeze(chart.chart_args), _freeze(chart.chart_kwargs)
+
+def render_charts(charts):
+    """
+    Resolves the Drawing for every ChartImage. Charts seen recently (or repeated within the
+    report) come from the in-memory cache; the rest are drawn once per distinct input.
+    """
+    pending = {}
+    with _CHART_CACHE_LOCK:
+        for chart in charts:
+            key = _chart_key(chart)
+            if key in _CHART_CACHE:
+                _CHART_CACHE.move_to_end(key)
+                chart.drawing = _CHART_CACHE[key]
+            else:
+                pending.setdefault(key, []).append(chart)
+
+    drawings = {}
+    for key, group in pending.items():
+        drawings[key] = group[0].chart_func(*group[0].chart_args, **group[0].chart_kwargs)
+        for chart in group:
+            chart.drawing = drawings[key]
+    with _CHART_CACHE_LOCK:
+        _CHART_CACHE.update(drawings)
+        while len(_CHART_CACHE) > _CHART_CACHE_SIZE:
+            _CHART_CACHE.popitem(last=False)
 
 # === Custom Flowable for Charts with Adjusted Dimensions ===
-class ChartImage(Image):
+class ChartImage(Flowable):
+    """
+    Chart placeholder whose Drawing is filled in by render_charts() and drawn as vector paths.
+    """
     def __init__(self, chart_func, width=400, height=300, *chart_args, **chart_kwargs):
-        img_buffer = chart_func(*chart_args, **chart_kwargs)
-        img_buffer.seek(0)
-        super().__init__(img_buffer, width=width, height=height)
+        super().__init__()
+        self.chart_func = chart_func
+        self.chart_args = chart_args
+        self.chart_kwargs = chart_kwargs
+        self.width = width
+        self.height = height
+        self.hAlign = "CENTER"
+        self.drawing = None
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.scale(self.width / self.drawing.width, self.height / self.drawing.height)
+        renderPDF.draw(self.drawing, self.canv, 0, 0)
 
 # === Section Cover Flowable for Separating Sections ===
 class SectionCover(Flowable):
@@ -150,69 +307,85 @@ class SectionCover(Flowable):
         canvas.drawCentredString(width/2 - 77, height/2 + 50, self.title)
 
 # === Data Formatting Functions ===
+# Filter values are lower-cased (all of Unicode, not just ASCII) with spaces turned into underscores
+_SPACES = str.maketrans({" ": "_"})
+
+def _norm(s):
+    return s.lower().translate(_SPACES)
+
+# Both services expect midnight timestamps for the requested days
+_DAY_FORMAT = "%Y-%m-%d 00:00:00"
+
 def formatAthenaData(report_data):
-    start = report_data.date_start
-    end = report_data.date_end
-    start = datetime(start.year, start.month, start.day)
-    end = datetime(end.year, end.month, end.day)
     report_dict = {
-        "date_start": str(datetime(start.year, start.month, start.day)),
-        "date_end": str(datetime(end.year, end.month, end.day)),
-        "industry": [industry.lower().replace(" ", "_") for industry in report_data.industry],
-        "continents": [continent.replace("", "") for continent in report_data.continents],
+        "date_start": report_data.date_start.strftime(_DAY_FORMAT),
+        "date_end": report_data.date_end.strftime(_DAY_FORMAT),
+        "industry": list(map(_norm, report_data.industry)),
+        "continents": list(report_data.continents),
         "alerts": report_data.alerts,
-        "devices": [device.lower().replace(" ", "_") for device in report_data.devices],
-        "resolutions": [resolution.lower().replace(" ", "_") for resolution in report_data.resolutions],
-        "events": [event.lower().replace(" ", "_") for event in report_data.events],
+        "devices": list(map(_norm, report_data.devices)),
+        "resolutions": list(map(_norm, report_data.resolutions)),
+        "events": list(map(_norm, report_data.events)),
     }
     return report_dict
 
 def formatOracleData(report_data):
-    end = report_data.date_end
-    end = datetime(end.year, end.month, end.day)
     report_dict = {
-        "resolution_reason": [resolution.lower().replace(" ", "_") for resolution in report_data.resolutions],
-        "device_type": [device.lower().replace(" ", "_") for device in report_data.devices],
+        "resolution_reason": list(map(_norm, report_data.resolutions)),
+        "device_type": list(map(_norm, report_data.devices)),
         "sensor_type": report_data.alerts,
-        "event_type": [event.lower().replace(" ", "_") for event in report_data.events],
-        "industry": [industry.lower().replace(" ", "_") for industry in report_data.industry],
-        "continent": [continent.replace("", "") for continent in report_data.continents],
-        "date_end": str(datetime(end.year, end.month, end.day)),
+        "event_type": list(map(_norm, report_data.events)),
+        "industry": list(map(_norm, report_data.industry)),
+        "continent": list(report_data.continents),
+        "date_end": report_data.date_end.strftime(_DAY_FORMAT),
     }
     return report_dict
 
 # === Data Fetching Functions ===
-def getAthenaData(report_data) -> dict:
+# Pooled client shared by every report so keep-alive connections to Athena and Oracle survive
+# between reports; it binds to the server's event loop on first use.
+_CLIENT = httpx.AsyncClient(http2=True, timeout=60, limits=httpx.Limits(max_keepalive_connections=20, max_connections=100))
+
+# Request bodies are serialized with orjson rather than httpx's stdlib json
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+async def close_client():
+    await _CLIENT.aclose()
+
+async def getAthenaData(client, report_data) -> dict:
     ATHENA_URL = os.getenv("ATHENA_URL").rstrip("/")
-    with httpx.Client() as client:
-        try:
-            report_dict = formatAthenaData(report_data)
-            response = client.post(f"{ATHENA_URL}/report_data", json=report_dict, timeout=60)
-            response.raise_for_status()
-            response_dict = json.loads(response.text)
-        except Exception as e:
-            print("ERROR in getAthenaData:")
-            print(e)
-            raise e
+    try:
+        report_dict = formatAthenaData(report_data)
+        response = await client.post(f"{ATHENA_URL}/report_data", content=orjson.dumps(report_dict),
+                                     headers=_JSON_HEADERS, timeout=60)
+        response.raise_for_status()
+        response_dict = orjson.loads(response.content)
+    except Exception as e:
+        log.error("ERROR in getAthenaData: %s", e)
+        raise e
     return response_dict
 
-def getOracleData(report_data) -> dict:
+async def getOracleData(client, report_data) -> dict:
     ORACLE_URL = os.getenv("ORACLE_URL").rstrip("/")
-    with httpx.Client() as client:
-        try:
-            report_dict = formatOracleData(report_data)
-            print("REQUEST:", report_dict)
-            response = client.post(f"{ORACLE_URL}/report_data", json=report_dict, timeout=300)
-            response.raise_for_status()
-            print("RESPONSE:")
-            response_dict = json.loads(response.text)
-            print(response_dict)
-        except Exception as e:
-            print("ERROR in getOracleData:")
-            print(e)
-            response_dict = {}
+    try:
+        report_dict = formatOracleData(report_data)
+        log.debug("Oracle request: %s", report_dict)
+        response = await client.post(f"{ORACLE_URL}/report_data", content=orjson.dumps(report_dict),
+                                     headers=_JSON_HEADERS, timeout=300)
+        response.raise_for_status()
+        response_dict = orjson.loads(response.content)
+        log.debug("Oracle response: %s", response_dict)
+    except Exception as e:
+        log.error("ERROR in getOracleData: %s", e)
+        response_dict = {}
     return response_dict
 
+async def _fetch_all(client, report_data):
+    """
+    Fetches Athena and Oracle data concurrently; the two services are independent.
+    """
+    return await asyncio.gather(getAthenaData(client, report_data), getOracleData(client, report_data))
+
 # === PDF Page Layout Functions ===
 def add_background(canvas, doc):
     width, height = doc.pagesize
@@ -224,6 +397,11 @@ def add_background(canvas, doc):
     canvas.setFillColor(colors.black)
     canvas.drawCentredString(width / 2, 15, f"Page {doc.page}")
 
+@lru_cache(maxsize=1)
+def _logo():
+    # Decoded once per process; ReportLab reuses the reader's pixel data in every report
+    return ImageReader("./assets/blackline-horizon.png")
+
 def draw_cover(canvas, doc, report_data):
     width, height = doc.pagesize
     # White background cover page with red header
@@ -231,8 +409,7 @@ def draw_cover(canvas, doc, report_data):
     canvas.rect(0, 0, width, height, fill=1)
     canvas.setFillColor(colors.HexColor("#a6192e"))
     canvas.rect(0, height - 50, width, 50, fill=1)
-    logo_path = "./assets/blackline-horizon.png"
-    canvas.drawImage(logo_path, width/2 - (375/2), height - 300, width=375, height=80, mask='auto')
+    canvas.drawImage(_logo(), width/2 - (375/2), height - 300, width=375, height=80, mask='auto')
     # Removed "Blackline Horizon" text since the logo suffices
     canvas.setFont("Roboto-Light", 18)
     canvas.setFillColor(colors.black)
@@ -242,43 +419,169 @@ def draw_cover(canvas, doc, report_data):
     canvas.drawCentredString(width/2, height - 350, f"Generated: {generated_on}")
 
 # === Data Aggregation & Preparation Functions ===
-def prepare_multiline_grouped_data(grouped_data_by_date):
+def grouped_to_frame(grouped_data_by_date):
     """
-    Converts date-keyed data into (x_values, y_series) suitable for multi-line charts.
+    Pivots date-keyed data into (dates, keys, counts), counts being a dates x keys array,
+    so a section's bar totals and line series come from the same structure.
     """
-    keys = set()
-    for values in grouped_data_by_date.values():
-        keys.update(values.keys())
-    normalized_grouped_data = {}
-    for date, values in grouped_data_by_date.items():
-        normalized_values = {}
-        for k, v in values.items():
-            normalized_key = "None" if k == "null" else k
-            normalized_values[normalized_key] = v
-        normalized_grouped_data[date] = normalized_values
-    if "null" in keys:
-        keys.remove("null")
-        keys.add("None")
-    x_values = sorted(normalized_grouped_data.keys())
-    y_series = {k: [] for k in keys}
-    for date in x_values:
-        day_data = normalized_grouped_data.get(date, {})
-        for k in keys:
-            y_series[k].append(day_data.get(k, 0))
-    return x_values, y_series
-
-def aggregate_grouped_values(grouped_data_by_date):
+    dates = sorted(grouped_data_by_date)
+    columns = {}
+    for day_data in grouped_data_by_date.values():
+        for k in day_data:
+            columns.setdefault("None" if k == "null" else k, len(columns))
+    counts = np.zeros((len(dates), len(columns)))
+    for i, date in enumerate(dates):
+        for k, v in grouped_data_by_date[date].items():
+            counts[i, columns["None" if k == "null" else k]] = v
+    return dates, list(columns), counts
+
+# === Static Report Text ===
+@lru_cache(maxsize=1)
+def _build_static():
     """
-    Aggregates values by key across all dates.
+    Builds the constant headings and descriptions of the report once, keyed by section.
     """
-    aggregated = defaultdict(int)
-    for day_data in grouped_data_by_date.values():
-        for key, value in day_data.items():
-            aggregated[key] += value
-    return dict(aggregated)
+    _register_fonts()
+    h1, h2, normal = custom_styles["Heading1"], custom_styles["Heading2"], custom_styles["Normal"]
+    return {
+        "intro": (
+            Paragraph("Introduction", h1),
+            Spacer(1, 24),
+            Paragraph(
+                "This report provides an in-depth analysis of alert data collected over the past year. "
+                "It examines system performance, identifies trends, and highlights areas for improvement. "
+                "The following sections break down the data from various angles and provide insights to guide future actions.",
+                normal
+            ),
+            Spacer(1, 24),
+        ),
+        "alert_count": (
+            Paragraph("Alert Count Over Time", h2),
+            Spacer(1, 12),
+            Paragraph(
+                "The line graph below highlights fluctuations in alert volume over time, helping to quickly identify periods of high activity that may warrant further investigation.",
+                normal
+            ),
+        ),
+        "resolution_reason": (
+            Paragraph("Resolutions Analysis", h1),
+            Spacer(1, 12),
+            Paragraph(
+                "This section breaks down the types of resolutions applied to alerts. The charts below display aggregate counts and trends over time, helping assess the effectiveness of various resolution strategies.",
+                normal
+            ),
+        ),
+        "device_type": (
+            Paragraph("Device Analysis", h1),
+            Spacer(1, 12),
+            Paragraph(
+                "This section examines alert distributions across different device types, helping identify areas where targeted maintenance or optimization may be needed.",
+                normal
+            ),
+        ),
+        "sensor_type": (
+            Paragraph("Sensor Analysis", h1),
+            Spacer(1, 12),
+            Paragraph(
+                "Sensor data is critical for understanding alert generation. The charts below display sensor-specific alert counts and their trends over time.",
+                normal
+            ),
+        ),
+        "industry": (
+            Paragraph("Industry Analysis", h1),
+            Spacer(1, 12),
+            Paragraph(
+                "This section segments alert data by industry, revealing trends that may highlight market-specific challenges and opportunities.",
+                normal
+            ),
+        ),
+        "event_type": (
+            Paragraph("Event Analysis", h1),
+            Spacer(1, 12),
+            Paragraph(
+                "Events can have a significant impact on alert patterns. This section breaks down alerts by event type and examines their trends over time.",
+                normal
+            ),
+        ),
+        "ai_insights": (
+            Paragraph("Past Month & Next Month Analysis", h1),
+            Spacer(1, 12),
+            Paragraph(
+                "This section compares actual alert data from the past month with AI-generated forecasts. "
+                "The analysis identifies discrepancies between observed data and predictions, refining future forecasts.",
+                normal
+            ),
+            Spacer(1, 12),
+            Paragraph("Past Month Alert Comparison", h2),
+            Spacer(1, 12),
+            Paragraph(
+                "The bar chart below contrasts the actual alert counts from the past 4 weeks with AI predictions, helping evaluate forecasting accuracy.",
+                normal
+            ),
+        ),
+        "forecast": (
+            Paragraph("Next Month Forecast", h2),
+            Spacer(1, 12),
+        ),
+        "no_predictions": (
+            Paragraph("Predictive Analytics", h1),
+            Paragraph(
+                "There is not enough historical data to generate reliable predictions at this time. "
+                "As more alert data is collected, predictive forecasting will become available in future reports.",
+                normal
+            ),
+            Spacer(1, 12),
+        ),
+        "conclusion": (
+            Paragraph("Conclusion", h1),
+            Spacer(1, 12),
+            Paragraph(
+                "In summary, the analysis above reveals key trends in alert data across multiple dimensions. "
+                "The detailed breakdown—from overall trends to device, sensor, industry, and event insights—provides a comprehensive view of system performance, enabling proactive adjustments and strategic planning.",
+                normal
+            ),
+            Spacer(1, 12),
+        ),
+    }
+
+def _static(section):
+    # ReportLab keeps layout state on flowables while building, so every report gets its own copies
+    return [copy.copy(flowable) for flowable in _build_static()[section]]
+
+# Grouped analysis sections in report order:
+# (grouped_data key, chart subject, category axis label, bar chart height, trend chart height)
+SECTIONS = (
+    ("resolution_reason", "Resolution", "Resolution Type", 400, 400),
+    ("device_type", "Device", "Device Type", 350, 400),
+    ("sensor_type", "Sensor", "Sensor Type", 350, 350),
+    ("industry", "Industry", "Industry", 450, 350),
+    ("event_type", "Event", "Event Type", 400, 350),
+)
 
 # === Main PDF Generation Function ===
-def generate_pdf(report_data):
+# Layout is CPU-bound pure Python, so reports are built in worker processes to keep it off the
+# event loop and its GIL.
+def create_pdf_pool(workers):
+    """
+    Creates the process pool generate_pdf builds reports in. Its processes come from a forkserver
+    with this module preloaded, or are spawned where there is no forkserver (Windows), so they
+    don't inherit the web worker's event loop or open sockets.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+    else:
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+async def generate_pdf(report_data, pool):
+    # Fetch Athena and Oracle data first, then build the document in the PDF pool
+    athena_data, oracle_data = await _fetch_all(_CLIENT, report_data)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, build_pdf, report_data, athena_data, oracle_data)
+
+def build_pdf(report_data, athena_data, oracle_data):
+    _register_fonts()
     buffer = io.BytesIO()
     doc = BaseDocTemplate(buffer, pagesize=letter, title=report_data.title)
 
@@ -296,10 +599,8 @@ def generate_pdf(report_data):
     # toc = TableOfContents()
     # toc.levelStyles = [custom_styles["TOC"]]
     
-    elements = []
     # Start with cover page then switch to Body template:
-    elements.append(NextPageTemplate("Body"))
-    elements.append(PageBreak())
+    elements = [NextPageTemplate("Body"), PageBreak()]
     
     # # Table of Contents
     # elements.append(Paragraph("Table of Contents", custom_styles["Heading1"]))
@@ -307,196 +608,91 @@ def generate_pdf(report_data):
     # elements.append(PageBreak())
     
     # --- Add Section Cover for Analytics (centered) ---
-    elements.append(SectionCover("Analytics Section"))
-    elements.append(PageBreak())
+    elements.extend((SectionCover("Analytics Section"), PageBreak()))
     
     # --- Introduction Section with Increased Spacing ---
-    elements.append(Paragraph("Introduction", custom_styles["Heading1"]))
-    elements.append(Spacer(1, 24))
-    elements.append(Paragraph(
-        "This report provides an in-depth analysis of alert data collected over the past year. "
-        "It examines system performance, identifies trends, and highlights areas for improvement. "
-        "The following sections break down the data from various angles and provide insights to guide future actions.",
-        custom_styles["Normal"]
-    ))
-    elements.append(Spacer(1, 24))
+    elements.extend(_static("intro"))
     
     # --- Alert Count Over Time ---
-    # Fetch Athena and Oracle data first:
-    athena_data = getAthenaData(report_data)
-    oracle_data = getOracleData(report_data)
     oracle_blank = not bool(oracle_data)
     
     dates = athena_data.get("time_series_overall", {}).get("date_created", [])
     alert_counts = athena_data.get("time_series_overall", {}).get("alert_count", [])
     
-    elements.append(Paragraph("Alert Count Over Time", custom_styles["Heading2"]))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph(
-        "The line graph below highlights fluctuations in alert volume over time, helping to quickly identify periods of high activity that may warrant further investigation.",
-        custom_styles["Normal"]
-    ))
-    elements.append(ChartImage(create_multi_line_chart, 400, 250, dates, {"Alert Count": alert_counts},
-                                 "Alert Count Over Time", "Date", "Alerts"))
-    elements.append(Spacer(1, 12))
-    elements.append(PageBreak())
-    
-    # --- Resolutions Analysis Section ---
-    elements.append(Paragraph("Resolutions Analysis", custom_styles["Heading1"]))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph(
-        "This section breaks down the types of resolutions applied to alerts. The charts below display aggregate counts and trends over time, helping assess the effectiveness of various resolution strategies.",
-        custom_styles["Normal"]
-    ))
-    resolutions = athena_data['grouped_data']['resolution_reason']
-    resolutions_grouped = aggregate_grouped_values(resolutions)
-    elements.append(ChartImage(create_bar_chart, 400, 400, list(resolutions_grouped.values()), list(resolutions_grouped.keys()),
-                                 "Resolution Analysis", "Resolution Type", "Alerts"))
-    elements.append(Spacer(1, 12))
-    x_vals, y_series = prepare_multiline_grouped_data(resolutions)
-    elements.append(ChartImage(create_multi_line_chart, 400, 400, x_vals, y_series,
-                                 "Resolution Trends Over Time", "Date", "Alerts"))
-    elements.append(Spacer(1, 12))
-    elements.append(PageBreak())
-    
-    # --- Device Analysis Section ---
-    elements.append(Paragraph("Device Analysis", custom_styles["Heading1"]))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph(
-        "This section examines alert distributions across different device types, helping identify areas where targeted maintenance or optimization may be needed.",
-        custom_styles["Normal"]
-    ))
-    devices = athena_data['grouped_data']['device_type']
-    devices_grouped = aggregate_grouped_values(devices)
-    elements.append(ChartImage(create_bar_chart, 400, 350, list(devices_grouped.values()), list(devices_grouped.keys()),
-                                 "Device Analysis", "Device Type", "Alerts"))
-    elements.append(Spacer(1, 12))
-    x_vals, y_series = prepare_multiline_grouped_data(devices)
-    elements.append(ChartImage(create_multi_line_chart, 400, 400, x_vals, y_series,
-                                 "Device Trends Over Time", "Date", "Alerts"))
-    elements.append(Spacer(1, 12))
-    elements.append(PageBreak())
-    
-    # --- Sensor Analysis Section ---
-    elements.append(Paragraph("Sensor Analysis", custom_styles["Heading1"]))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph(
-        "Sensor data is critical for understanding alert generation. The charts below display sensor-specific alert counts and their trends over time.",
-        custom_styles["Normal"]
-    ))
-    sensors = athena_data['grouped_data']['sensor_type']
-    sensors_grouped = aggregate_grouped_values(sensors)
-    elements.append(ChartImage(create_bar_chart, 400, 350, list(sensors_grouped.values()), list(sensors_grouped.keys()),
-                                 "Sensor Analysis", "Sensor Type", "Alerts"))
-    elements.append(Spacer(1, 12))
-    x_vals, y_series = prepare_multiline_grouped_data(sensors)
-    elements.append(ChartImage(create_multi_line_chart, 400, 350, x_vals, y_series,
-                                 "Sensor Trends Over Time", "Date", "Alerts"))
-    elements.append(Spacer(1, 12))
-    elements.append(PageBreak())
-    
-    # --- Industry Analysis Section ---
-    elements.append(Paragraph("Industry Analysis", custom_styles["Heading1"]))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph(
-        "This section segments alert data by industry, revealing trends that may highlight market-specific challenges and opportunities.",
-        custom_styles["Normal"]
-    ))
-    industry = athena_data['grouped_data']['industry']
-    industry_grouped = aggregate_grouped_values(industry)
-    elements.append(ChartImage(create_bar_chart, 400, 450, list(industry_grouped.values()), list(industry_grouped.keys()),
-                                 "Industry Analysis", "Industry", "Alerts"))
-    elements.append(Spacer(1, 12))
-    x_vals, y_series = prepare_multiline_grouped_data(industry)
-    elements.append(ChartImage(create_multi_line_chart, 400, 350, x_vals, y_series,
-                                 "Industry Trends Over Time", "Date", "Alerts"))
-    elements.append(Spacer(1, 12))
-    elements.append(PageBreak())
+    elements.extend(_static("alert_count"))
+    if dates:
+        elements.append(ChartImage(create_multi_line_chart, 400, 250, dates, {"Alert Count": alert_counts},
+                                   "Alert Count Over Time", "Date", "Alerts"))
+    else:
+        elements.append(Paragraph("No alert data for this period.", custom_styles["Normal"]))
+    elements.extend((Spacer(1, 12), PageBreak()))
     
-    # --- Event Analysis Section ---
-    elements.append(Paragraph("Event Analysis", custom_styles["Heading1"]))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph(
-        "Events can have a significant impact on alert patterns. This section breaks down alerts by event type and examines their trends over time.",
-        custom_styles["Normal"]
-    ))
-    event = athena_data['grouped_data']['event_type']
-    event_grouped = aggregate_grouped_values(event)
-    elements.append(ChartImage(create_bar_chart, 400, 400, list(event_grouped.values()), list(event_grouped.keys()),
-                                 "Event Analysis", "Event Type", "Alerts"))
-    elements.append(Spacer(1, 12))
-    x_vals, y_series = prepare_multiline_grouped_data(event)
-    elements.append(ChartImage(create_multi_line_chart, 400, 350, x_vals, y_series,
-                                 "Event Trends Over Time", "Date", "Alerts"))
-    elements.append(Spacer(1, 12))
-    elements.append(PageBreak())
+    # --- Grouped Analysis Sections ---
+    for key, subject, category, bar_height, trend_height in SECTIONS:
+        x_vals, keys, counts = grouped_to_frame(athena_data['grouped_data'][key])
+        elements.extend(_static(key))
+        # Skip charts that would be empty, and trends that would be a single point
+        if not keys:
+            elements.extend((
+                Paragraph(f"No {subject.lower()} data for this period.", custom_styles["Normal"]),
+                Spacer(1, 12),
+                PageBreak(),
+            ))
+            continue
+        elements.extend((
+            ChartImage(create_bar_chart, 400, bar_height, counts.sum(axis=0).tolist(), keys,
+                       f"{subject} Analysis", category, "Alerts"),
+            Spacer(1, 12),
+        ))
+        if len(x_vals) > 1:
+            elements.extend((
+                ChartImage(create_multi_line_chart, 400, trend_height, x_vals, dict(zip(keys, counts.T.tolist())),
+                           f"{subject} Trends Over Time", "Date", "Alerts"),
+                Spacer(1, 12),
+            ))
+        elements.append(PageBreak())
     
     # --- AI Insights or Predictive Analytics Section ---
     if not oracle_blank:
         # Existing AI Insights section:
-        elements.append(SectionCover("AI Insights"))
-        elements.append(PageBreak())
+        elements.extend((SectionCover("AI Insights"), PageBreak()))
         
-        elements.append(Paragraph("Past Month & Next Month Analysis", custom_styles["Heading1"]))
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph(
-            "This section compares actual alert data from the past month with AI-generated forecasts. "
-            "The analysis identifies discrepancies between observed data and predictions, refining future forecasts.",
-            custom_styles["Normal"]
-        ))
-        elements.append(Spacer(1, 12))
-        
-        elements.append(Paragraph("Past Month Alert Comparison", custom_styles["Heading2"]))
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph(
-            "The bar chart below contrasts the actual alert counts from the past 4 weeks with AI predictions, helping evaluate forecasting accuracy.",
-            custom_styles["Normal"]
-        ))
+        elements.extend(_static("ai_insights"))
         actual_last_4w = oracle_data['actual_last_4w']
         monthly_alerts = [actual_last_4w, oracle_data['predicted_next_4w']]
-        elements.append(ChartImage(create_multi_line_chart, 400, 250, dates, {"Alert Count": alert_counts},
-                                 "Alert Count Over Time", "Date", "Alerts"))
         monthly_alerts_labels = ['Actual Last 4 Weeks', 'Predicted Next 4 Weeks']
-        elements.append(ChartImage(create_multi_line_chart, 350, 250, monthly_alerts_labels, {"Alerts":monthly_alerts},
-                                     "Past Month Alert Comparison", "Category", "Alert Count"))
-        elements.append(Spacer(1, 12))
+        elements.extend((
+            ChartImage(create_multi_line_chart, 400, 250, dates, {"Alert Count": alert_counts},
+                       "Alert Count Over Time", "Date", "Alerts"),
+            ChartImage(create_multi_line_chart, 350, 250, monthly_alerts_labels, {"Alerts":monthly_alerts},
+                       "Past Month Alert Comparison", "Category", "Alert Count"),
+            Spacer(1, 12),
+        ))
         
-        elements.append(Paragraph("Next Month Forecast", custom_styles["Heading2"]))
-        elements.append(Spacer(1, 12))
+        elements.extend(_static("forecast"))
         trend = "increase" if oracle_data['predicted_next_4w'] > actual_last_4w else "decrease"
-        elements.append(Paragraph(
-            f"Based on the AI model, an {trend} in alert counts is forecasted for the next four weeks. This predictive insight enables early resource allocation to address potential challenges.",
-            custom_styles["Normal"]
-        ))
-        elements.append(Spacer(1, 12))
         forecast_table = Table([
             ["Expected Alerts"],
             [str(oracle_data['predicted_next_4w'])]
         ], style=[("BACKGROUND", (0,0), (-1,0), colors.lightgrey),
                   ("ALIGN", (0,0), (-1,-1), "CENTER")])
-        elements.append(forecast_table)
-        elements.append(Spacer(1, 12))
-        elements.append(PageBreak())
+        elements.extend((
+            Paragraph(
+                f"Based on the AI model, an {trend} in alert counts is forecasted for the next four weeks. This predictive insight enables early resource allocation to address potential challenges.",
+                custom_styles["Normal"]
+            ),
+            Spacer(1, 12),
+            forecast_table,
+            Spacer(1, 12),
+            PageBreak(),
+        ))
     else:
         # Add this new section
-        elements.append(Paragraph("Predictive Analytics", custom_styles["Heading1"]))
-        elements.append(Paragraph(
-            "There is not enough historical data to generate reliable predictions at this time. "
-            "As more alert data is collected, predictive forecasting will become available in future reports.", 
-            custom_styles["Normal"]
-        ))
-        elements.append(Spacer(1, 12))
+        elements.extend(_static("no_predictions"))
         elements.append(PageBreak())
 
     # --- Conclusion Section ---
-    elements.append(Paragraph("Conclusion", custom_styles["Heading1"]))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph(
-        "In summary, the analysis above reveals key trends in alert data across multiple dimensions. "
-        "The detailed breakdown—from overall trends to device, sensor, industry, and event insights—provides a comprehensive view of system performance, enabling proactive adjustments and strategic planning.",
-        custom_styles["Normal"]
-    ))
-    elements.append(Spacer(1, 12))
+    elements.extend(_static("conclusion"))
     
     # # --- Add TOC Callback ---
     # def after_flowable(flowable):
@@ -508,7 +704,7 @@ def generate_pdf(report_data):
     
     # doc.afterFlowable = after_flowable
     
-    # Build the PDF document
+    # Draw every chart once, then build the PDF document around them
+    render_charts([element for element in elements if isinstance(element, ChartImage)])
     doc.build(elements)
-    buffer.seek(0)
-    return buffer.read()
+    return buffer.getvalue()
@@ -1,19 +1,24 @@
 from typing import Union, List
+from contextlib import asynccontextmanager
 import uvicorn
-from fastapi import FastAPI, HTTPException, Response
-from sqlalchemy import create_engine, select, delete, schema
-from sqlalchemy.orm import sessionmaker
-from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi import FastAPI, HTTPException, Response, Request, Depends
+from sqlalchemy import select, delete, schema, func, lambda_stmt, cast, Date, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import httpx
+import orjson
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+import time
 import os
 
-from io import BytesIO
-
 from schemas import ReportResponse, ReportCreate
 from models import Base, Report, PDFFile
-from generatepdf import generate_pdf
+from generatepdf import generate_pdf, create_pdf_pool, close_client
 
 
 # Load environment variables from the .env file
@@ -22,13 +27,79 @@ load_dotenv()
 # Get values from environment variables
 HOST = os.getenv("HOST", "127.0.0.1")
 PORT = int(os.getenv("PORT", 3003))
+# Each worker process gets its own database and PDF pools, which are sized below from this count
+WORKERS = int(os.getenv("WEB_CONCURRENCY", 1))
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", 1000))
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Oracle predictions change slowly, so they are cached briefly in-process
+PREDICTIONS_TTL = float(os.getenv("PREDICTIONS_TTL", 5))
+_predictions_cache = {}
+_predictions_inflight = {}
+
+# Report builds run in a per-worker process pool; by default the workers share the cores, at most two each
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", max(1, min(2, (os.cpu_count() or 1) // WORKERS))))
+
+# DB_MAX_CONNECTIONS is split between the workers, kept under PostgreSQL's default max_connections of 100
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 60))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", max(1, DB_MAX_CONNECTIONS // WORKERS // 3)))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", max(0, DB_MAX_CONNECTIONS // WORKERS - DB_POOL_SIZE)))
+
+# PDFs are read back from the database in slices of this many bytes
+PDF_CHUNK_SIZE = 64 * 1024
+
 # URLs for Oracle and Athena services
 ORACLE_URL = os.getenv("ORACLE_URL", "http://127.0.0.1:3002")
 ATHENA_URL = os.getenv("ATHENA_URL", "http://127.0.0.1:3001")
 
-app = FastAPI()
+# Create async engine; the same DATABASE_URL is served through the asyncpg driver
+engine = create_async_engine(
+    make_url(DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    echo=os.getenv("SQL_ECHO", "0") == "1",  # SQL statement logging, off unless SQL_ECHO=1
+)
+
+# Create sessionmaker with autoflush enabled; objects stay readable after commit
+SessionLocal = async_sessionmaker(
+    engine,
+    autoflush=True,
+    expire_on_commit=False,
+)
+
+def create_tables(conn):
+    # Create the 'report' schema if it doesn't exist
+    conn.execute(schema.CreateSchema("report", if_not_exists=True))
+    # conn.execute(schema.DropSchema("report", cascade=True))
+    # Create tables within the 'report' schema
+    Base.metadata.create_all(bind=conn)
+    # create_all skips tables that already exist, so add any of their newer indexes here
+    for index in Report.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
+    # Drop the username indexes older databases still have; the one above replaces them
+    for old_index in ("ix_report_report_username", "ix_report_username_covering"):
+        conn.execute(text(f"DROP INDEX IF EXISTS report.{old_index}"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with engine.begin() as conn:
+        await conn.run_sync(create_tables)
+
+    # Shared client so the proxy endpoints keep connections to Athena and Oracle alive
+    app.state.http = httpx.AsyncClient(
+        timeout=httpx.Timeout(connect=5, read=30, write=30, pool=10),
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=30),
+        http2=True,
+    )
+    app.state.pdf_pool = create_pdf_pool(PDF_WORKERS)
+    yield
+    app.state.pdf_pool.shutdown(cancel_futures=True)
+    await app.state.http.aclose()
+    await close_client()
+    await engine.dispose()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -38,49 +109,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create synchronous engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,  # Set to False in production
-)
+# Compress JSON responses such as /reports listings
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
-# Create sessionmaker with autoflush enabled
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=True,
-    bind=engine
-)
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http
 
-@app.on_event("startup")
-def startup_event():
-    # Create the 'report' schema if it doesn't exist
-    from sqlalchemy import text
-    with engine.connect() as conn:
-        if not engine.dialect.has_schema(conn, "report"):
-            try:
-                conn.execute(schema.CreateSchema("report"))
-                # conn.execute(schema.DropSchema("report", cascade=True))
-                conn.commit()
-            except Exception as e:
-                print("ERROR HAPPENED -----------------------------------")
-                print(e)
-    # Create tables within the 'report' schema
-    Base.metadata.create_all(bind=engine)
+async def get_db():
+    # The session, and its pooled connection, is released once the request is done
+    async with SessionLocal() as db:
+        yield db
 
 @app.get("/", response_class=PlainTextResponse)
 def read_root():
     return "Reporting from Hermes Service!"
 
 @app.post("/report", response_model=ReportResponse)
-def create_report(report_data: ReportCreate):
-    db = SessionLocal()
-    pdf_data = generate_pdf(report_data)
-    
-    # Store PDF first
+async def create_report(report_data: ReportCreate, request: Request, db: AsyncSession = Depends(get_db)):
+    pool = request.app.state.pdf_pool
+    try:
+        pdf_data = await generate_pdf(report_data, pool)
+    except BrokenProcessPool:
+        # A build process died (e.g. killed for memory), which breaks the whole pool; replace it once
+        # so later reports can still be built
+        if request.app.state.pdf_pool is pool:
+            request.app.state.pdf_pool = create_pdf_pool(PDF_WORKERS)
+            pool.shutdown(wait=False)
+        raise HTTPException(status_code=503, detail="Report generation failed, please try again")
+
+    # Store PDF first; flushing assigns its id without committing yet
     new_pdf = PDFFile(pdf_data=pdf_data)
     db.add(new_pdf)
-    db.commit()
-    db.refresh(new_pdf)
+    await db.flush()
 
     new_report = Report(
         title=report_data.title.title(),
@@ -95,39 +155,58 @@ def create_report(report_data: ReportCreate):
         username=report_data.username 
     )
 
+    # Both rows are committed together
     db.add(new_report)
-    db.commit()
-    db.refresh(new_report)
+    await db.commit()
 
     return new_report  
 
 @app.delete("/report")
-def deleteReport(report_id: int):
-    db = SessionLocal()
-    statement = delete(Report).where(Report.id == report_id)
-    print(db.execute(statement=statement))
-    db.commit()
+async def deleteReport(report_id: int, db: AsyncSession = Depends(get_db)):
+    # Delete the report and its PDF in one statement
+    deleted = delete(Report).where(Report.id == report_id).returning(Report.pdf_id).cte("deleted_report")
+    statement = (
+        delete(PDFFile)
+        .where(PDFFile.id.in_(select(deleted.c.pdf_id)))
+        .add_cte(deleted)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(statement=statement)
+    await db.commit()
     return Response()
 
 @app.get("/reports", response_model=List[ReportResponse])
-def list_reports(username:str):
-    db = SessionLocal()
-    statement = select(Report).filter_by(username=username)
-    reports = db.execute(statement=statement).scalars().all()
-    return reports if reports else [] 
+async def list_reports(username:str, db: AsyncSession = Depends(get_db)):
+    # Only the columns ReportResponse exposes; lambda_stmt caches the built statement between calls
+    statement = lambda_stmt(lambda: select(
+        Report.id, Report.title,
+        cast(Report.date_start, Date).label("date_start"), cast(Report.date_end, Date).label("date_end"),
+        Report.industry, Report.pdf_id,
+    ).where(Report.username == username))
+    reports = (await db.execute(statement=statement)).mappings().all()
+    # The rows already match ReportResponse, so serialize them directly instead of validating each one
+    return ORJSONResponse([dict(report) for report in reports])
+
+async def stream_pdf(pdf_id: int, size: int):
+    for start in range(1, size + 1, PDF_CHUNK_SIZE):
+        statement = lambda_stmt(
+            lambda: select(func.substring(PDFFile.pdf_data, start, PDF_CHUNK_SIZE)).where(PDFFile.id == pdf_id)
+        )
+        # Each slice uses its own short session, so a slow download doesn't hold a pooled connection
+        async with SessionLocal() as db:
+            chunk = (await db.execute(statement)).scalar_one()
+        yield chunk
 
 @app.get("/pdf_report")
-def get_pdf_report(pdf_id: int):
-    db = SessionLocal()
-    # Fetch PDF data from database
-    statement = select(PDFFile).where(PDFFile.id == pdf_id)
-    pdf = db.execute(statement).scalars().first()
-    if not pdf:
+async def get_pdf_report(pdf_id: int, db: AsyncSession = Depends(get_db)):
+    # Look up the PDF size without loading its data
+    statement = lambda_stmt(lambda: select(func.length(PDFFile.pdf_data)).where(PDFFile.id == pdf_id))
+    size = (await db.execute(statement)).scalar()
+    if size is None:
         raise HTTPException(status_code=404, detail="PDF not found")
-    # Convert binary data to BytesIO stream
-    pdf_stream = BytesIO(pdf.pdf_data)
-    # Return the PDF file as a response
-    return StreamingResponse(pdf_stream, media_type="application/pdf")
+    # Stream the PDF file from the database in chunks; PDFs are already compressed, so skip gzip
+    return StreamingResponse(stream_pdf(pdf_id, size), media_type="application/pdf",
+                             headers={"Content-Length": str(size), "Content-Encoding": "identity"})
 
 @app.get("/items/{item_id}")
 def read_item(item_id: int, q: Union[str, None] = None):
@@ -135,59 +214,75 @@ def read_item(item_id: int, q: Union[str, None] = None):
 
 
 @app.get("/alerts", response_model=dict)
-async def get_alerts(latitude: float, longitude: float, radius: float = 5):
+async def get_alerts(latitude: float, longitude: float, radius: float = 5,
+                     client: httpx.AsyncClient = Depends(get_http_client)):
     """
     Fetch alerts/insights from Athena service.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{ATHENA_URL}/insights/alerts",
-                json={"latitude": latitude, "longitude": longitude, "radius": radius},
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await client.post(
+            f"{ATHENA_URL}/insights/alerts",
+            json={"latitude": latitude, "longitude": longitude, "radius": radius},
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
     except httpx.RequestError as e:
         raise HTTPException(status_code=500, detail=f"Error contacting Athena service: {str(e)}")
     except httpx.HTTPStatusError as e:
         raise HTTPException(status_code=response.status_code, detail=response.text)
 
 
+async def refresh_predictions(client: httpx.AsyncClient) -> dict:
+    response = await client.get(f"{ORACLE_URL}/predictions")
+    response.raise_for_status()
+    predictions = orjson.loads(response.content)
+    _predictions_cache["predictions"] = (predictions, time.monotonic() + PREDICTIONS_TTL)
+    return predictions
+
+async def fetch_predictions(client: httpx.AsyncClient) -> dict:
+    """
+    Fetch predictions from Oracle, reusing the last response for PREDICTIONS_TTL seconds.
+    """
+    cached = _predictions_cache.get("predictions")
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    # Concurrent callers share one in-flight request, so they all get its result or its error together
+    task = _predictions_inflight.get("predictions")
+    if task is None or task.done():
+        task = _predictions_inflight["predictions"] = asyncio.ensure_future(refresh_predictions(client))
+    # shield keeps one caller's disconnect from cancelling the request the others are waiting on
+    return await asyncio.shield(task)
+
 @app.get("/predictions", response_model=dict)
-async def get_predictions():
+async def get_predictions(client: httpx.AsyncClient = Depends(get_http_client)):
     """
     Fetch dummy predictions from Oracle service.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{ORACLE_URL}/predictions")
-            response.raise_for_status()
-            return response.json()
+        return await fetch_predictions(client)
     except httpx.RequestError as e:
         raise HTTPException(status_code=500, detail=f"Error contacting Oracle service: {str(e)}")
     except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=response.status_code, detail=response.text)
+        raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
 
 
 @app.get("/combined", response_model=dict)
-async def get_combined(latitude: float, longitude: float, radius: float = 5):
+async def get_combined(latitude: float, longitude: float, radius: float = 5,
+                       client: httpx.AsyncClient = Depends(get_http_client)):
     """
     Fetch alerts from Athena and predictions from Oracle, then combine them.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            # Fetch alerts
-            alerts_response = await client.post(
+        # Fetch alerts and predictions concurrently
+        alerts_response, predictions = await asyncio.gather(
+            client.post(
                 f"{ATHENA_URL}/insights/alerts",
                 json={"latitude": latitude, "longitude": longitude, "radius": radius},
-            )
-            alerts_response.raise_for_status()
-            alerts = alerts_response.json()
-
-            # Fetch predictions
-            predictions_response = await client.get(f"{ORACLE_URL}/predictions")
-            predictions_response.raise_for_status()
-            predictions = predictions_response.json()
+            ),
+            fetch_predictions(client),
+        )
+        alerts_response.raise_for_status()
+        alerts = orjson.loads(alerts_response.content)
 
         # Combine results
         combined_response = {
@@ -199,8 +294,10 @@ async def get_combined(latitude: float, longitude: float, radius: float = 5):
     except httpx.RequestError as e:
         raise HTTPException(status_code=500, detail=f"Error contacting services: {str(e)}")
     except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=response.status_code, detail=response.text)
+        raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host=HOST, port=PORT, log_level="info")
\ No newline at end of file
+    # uvicorn picks uvloop and httptools on its own when they are installed
+    uvicorn.run("main:app", host=HOST, port=PORT, workers=WORKERS,
+                limit_concurrency=LIMIT_CONCURRENCY, backlog=2048, log_level="info")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, MetaData, LargeBinary
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, MetaData, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.postgresql import ARRAY
@@ -10,9 +10,15 @@ Base = declarative_base(metadata=metadata)
 
 class Report(Base):
     __tablename__ = "report"
+    # Carries the fixed-size /reports columns; title and industry are unbounded user input and
+    # would push rows past PostgreSQL's B-tree tuple size limit, so they are read from the table
+    __table_args__ = (
+        Index("ix_report_username_include", "username",
+              postgresql_include=["id", "date_start", "date_end", "pdf_id"]),
+    )
 
     id = Column(Integer, primary_key=True)
-    username = Column(String, index=True)
+    username = Column(String)
     title = Column(String, nullable=False)
     date_start = Column(DateTime, nullable = False)
     date_end = Column(DateTime, nullable = False)
@@ -23,7 +29,9 @@ class Report(Base):
     alerts = Column(ARRAY(String), nullable = False)
     pdf_id = Column(Integer, ForeignKey("pdf_files.id"), unique=True)
 
-    pdf = relationship("PDFFile", back_populates="report", cascade="all, delete-orphan", single_parent=True)
+    # Loading a PDF pulls its whole blob, so it must be asked for explicitly (e.g. selectinload)
+    pdf = relationship("PDFFile", back_populates="report", cascade="all, delete-orphan", single_parent=True,
+                       lazy="raise")
 
 class PDFFile(Base):
     __tablename__ = "pdf_files"
@@ -31,4 +39,4 @@ class PDFFile(Base):
     id = Column(Integer, primary_key=True, index=True)
     pdf_data = Column(LargeBinary, nullable=False)
 
-    report = relationship("Report", back_populates="pdf", uselist=False)
+    report = relationship("Report", back_populates="pdf", uselist=False, lazy="raise")
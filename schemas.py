@@ -1,19 +1,19 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict
 from typing import List
 from datetime import date
 
 class ReportCreate(BaseModel):
 
-    username: str = Field(...)
-    title: str = Field(...)
-    date_start: date= Field(...)
-    date_end: date= Field(...)
-    industry: List[str] = Field(...)
-    continents: List[str] = Field(...)
-    alerts: List[str]= Field(...)
-    devices: List[str] = Field(...)
-    resolutions: List[str] = Field(...)
-    events: List[str]=Field(...)
+    username: str
+    title: str
+    date_start: date
+    date_end: date
+    industry: List[str]
+    continents: List[str]
+    alerts: List[str]
+    devices: List[str]
+    resolutions: List[str]
+    events: List[str]
 
 
 class ReportResponse(BaseModel):
@@ -22,8 +22,7 @@ class ReportResponse(BaseModel):
     title: str
     date_start: date
     date_end: date
-    industry: list
+    industry: List[str]
     pdf_id: int
 
-    class Config:
-        from_attributes = True  # Updated from `orm_mode` to `from_attributes`
+    model_config = ConfigDict(from_attributes=True)